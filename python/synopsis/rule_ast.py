@@ -1,8 +1,13 @@
 """
 Abstract Syntax Tree representation for SYNOPSIS rules
 """
+import logging
+import math
+from bisect import bisect_left, bisect_right
 from itertools import product
 from json import JSONEncoder
+from operator import lt, le, gt, ge, eq, ne, mul, add, sub, neg, not_
+from weakref import WeakValueDictionary
 
 
 class RuleJSONEncoder(JSONEncoder):
@@ -14,8 +19,370 @@ class RuleJSONEncoder(JSONEncoder):
             return JSONEncoder.default(self, obj)
 
 
+def to_plain(obj):
+    """
+    Converts rules and expressions (or containers of them) into the plain
+    dictionaries and lists that RuleJSONEncoder would serialize them as
+    """
+    if isinstance(obj, JSONEncodable):
+        # The dictionaries from `__json__` are new, so rather than copying
+        # them, their contents are converted in place
+        plain = obj.__json__()
+        contents = plain['__contents__']
+        for k, v in contents.items():
+            contents[k] = to_plain(v)
+        return plain
+    elif isinstance(obj, dict):
+        return {k: to_plain(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [to_plain(v) for v in obj]
+    else:
+        return obj
+
+
+def _variable_name(variable):
+    # Prefix rule variables so they cannot collide with Python keywords or
+    # names used within compiled expressions
+    return f'_v_{variable}'
+
+
+def _exists(predicate, asdps):
+    for a in asdps:
+        try:
+            value = predicate(a)
+        except KeyError:
+            # If assignment invalid, skip candidate for existential qualifier
+            continue
+        if value: return True
+    return False
+
+
+# Functions implementing each comparator and arithmetic operator
+_COMPARISONS = {'<': lt, '<=': le, '>': gt, '>=': ge, '==': eq, '!=': ne}
+_ARITHMETIC_OPERATIONS = {'*': mul, '+': add, '-': sub}
+
+
+def _run_ops(ops, assignment, asdps):
+    """
+    Evaluates the postfix operations produced by `compile_ops` on a stack,
+    for an assignment of variables to ASDPs
+    """
+    stack = []
+    i = 0
+    while i < len(ops):
+        op = ops[i]
+        i += 1
+        code = op[0]
+        if code == 'FIELD':
+            stack.append(assignment[op[1]][op[2]])
+        elif code == 'CONST':
+            stack.append(op[1])
+        elif code == 'BINARY':
+            right = stack.pop()
+            stack[-1] = op[1](stack[-1], right)
+        elif code == 'UNARY':
+            stack[-1] = op[1](stack[-1])
+        elif code == 'AND':
+            # Leave a false first operand as the value, otherwise evaluate the
+            # second operand
+            if stack[-1]:
+                stack.pop()
+            else:
+                i = op[1]
+        elif code == 'OR':
+            if stack[-1]:
+                i = op[1]
+            else:
+                stack.pop()
+        elif code == 'EXISTS':
+            variable, body = op[1], op[2]
+            new_assignment = dict(assignment)
+            def predicate(a):
+                new_assignment[variable] = a
+                return _run_ops(body, new_assignment, asdps)
+            stack.append(_exists(predicate, asdps))
+        else:
+            raise ValueError(f'Unknown operation "{code}"')
+    return stack[-1]
+
+
+# Hash-consing table of interned expressions, keyed by `_key()`
+_HCONS = WeakValueDictionary()
+
+
+def _hcons(expression):
+    return _HCONS.setdefault(expression._key(), expression)
+
+
+def _shared_subexpressions(condition, expression):
+    """
+    Returns names for the non-constant subexpressions of `expression` that
+    are always evaluated by `condition` when it holds, keyed by their `id`
+    """
+    evaluated = set(map(id, condition.certain_subexpressions(True)))
+    names = {}
+    for e in expression.certain_subexpressions(None):
+        if id(e) in evaluated and len(e.exposed_variables()) > 0:
+            names.setdefault(id(e), f'_s{len(names)}')
+    return names
+
+
+def _build_index(asdps, field, ordered):
+    # ASDPs without the field (or with a NaN value) cannot satisfy a
+    # comparison with it, so are left out of the index
+    entries = [
+        (a[field], a) for a in asdps
+        if field in a and a[field] == a[field]
+    ]
+    try:
+        if ordered:
+            entries.sort(key=lambda e: e[0])
+            return [k for k, _ in entries], [a for _, a in entries]
+
+        index = {}
+        for k, a in entries:
+            index.setdefault(k, []).append(a)
+        return index
+
+    except TypeError:
+        # Values are unhashable or cannot be ordered
+        return None
+
+
+def _candidates(indexes, asdps, field, comparator, key):
+    """
+    Returns a subset of ASDPs containing all those for which
+    `asdp[field] <comparator> key()` holds, using an index of the ASDPs by
+    field that is built on first use and stored in `indexes`
+    """
+    ordered = (comparator != '==')
+    if (field, ordered) not in indexes:
+        indexes[field, ordered] = _build_index(asdps, field, ordered)
+    index = indexes[field, ordered]
+    if index is None:
+        return asdps
+
+    try:
+        value = key()
+    except KeyError:
+        # The comparison cannot be evaluated for any candidate
+        return ()
+
+    try:
+        if not ordered:
+            return index.get(value, ())
+
+        keys, items = index
+        if comparator == '<':
+            return items[:bisect_left(keys, value)]
+        elif comparator == '<=':
+            return items[:bisect_right(keys, value)]
+        elif comparator == '>':
+            return items[bisect_right(keys, value):]
+        else:
+            return items[bisect_left(keys, value):]
+
+    except TypeError:
+        # Leave any error to be raised by the comparison itself
+        return asdps
+
+
+_log = logging.getLogger(__name__)
+
+
+def _log_application(variables, values, adj_value):
+    # Callers check that debug messages are enabled before collecting values
+    assigned_ids = {
+        k: v['id']
+        for k, v in zip(variables, values)
+    }
+    _log.debug('Applied rule with %s, adjustment = %s', assigned_ids, adj_value)
+
+
+# Rules with more variables than this iterate over `product` rather than
+# explicitly nested loops
+MAX_NESTED_LOOP_ARITY = 3
+
+
+def _assignment_loops(variables):
+    """
+    Returns source lines for loops over all assignments of ASDPs to variables,
+    along with the indentation of the loop body
+    """
+    names = [_variable_name(v) for v in variables]
+    if len(names) > MAX_NESTED_LOOP_ARITY:
+        return (
+            [f'    for {", ".join(names)} in _product(_asdps, repeat={len(names)}):'],
+            8 * ' '
+        )
+
+    lines = [
+        f'{(i + 1) * 4 * " "}for {name} in _asdps:'
+        for i, name in enumerate(names)
+    ]
+    return lines, (len(names) + 1) * 4 * ' '
+
+
+# Errors raised when expressions are nested too deeply for Python to compile
+_COMPILE_ERRORS = (SyntaxError, MemoryError, RecursionError)
+
+
+def _compile_function(name, lines, namespace):
+    """
+    Compiles source lines defining the named function and returns it
+    """
+    namespace = dict(namespace)
+    namespace.update({
+        '__builtins__': {},
+        '_exists': _exists,
+        '_candidates': _candidates,
+        '_product': product,
+        '_inf': math.inf,
+        '_nan': math.nan,
+    })
+    exec(compile('\n'.join(lines), f'<{name}>', 'exec'), namespace)
+    return namespace[name]
+
+
+# Rules are only evaluated with Numba when there are at least this many
+# assignments of ASDPs to variables, so that JIT compilation (around half a
+# second per rule) pays off even if the rule is only applied once
+NUMBA_MIN_ASSIGNMENTS = 10000000
+
+# Marks rules that Numba cannot compile, so that compilation is not retried
+_NUMBA_FAILED = object()
+
+_numba = None
+_numba_imported = False
+
+
+def _import_numba():
+    """
+    Returns the numba module, which is only imported once needed since it is
+    slow to import, or None (with a warning) if it is unavailable
+    """
+    global _numba, _numba_imported
+    if not _numba_imported:
+        _numba_imported = True
+        try:
+            import numba
+            _numba = numba
+        except ImportError:
+            print('Warning: numba is not available; rules will not be JIT-compiled')
+    return _numba
+
+
+def _numba_operands(*expressions):
+    """
+    Returns the fields and string constants referenced by the expressions if
+    they only involve operations supported by Numba (which can also be
+    vectorized with NumPy), otherwise None
+    """
+    supported = (
+        LogicalConstant, LogicalNot, BinaryLogicalExpression,
+        ComparatorExpression, ConstExpression, StringConstant,
+        BinaryExpression, NaryExpression, MinusExpression, Field,
+    )
+    fields = []
+    strings = []
+    for expression in expressions:
+        for e in expression.subexpressions():
+            if type(e) not in supported:
+                return None
+            if type(e) == Field and e.field_name not in fields:
+                fields.append(e.field_name)
+            if type(e) == StringConstant and e.value not in strings:
+                strings.append(e.value)
+    return tuple(fields), tuple(strings)
+
+
+def _only_compares_strings(expressions, string_fields):
+    """
+    Returns whether strings (string constants and the given fields) are only
+    ever compared with other strings
+    """
+    def is_string(e):
+        return (
+            type(e) == StringConstant or
+            (type(e) == Field and e.field_name in string_fields)
+        )
+
+    # Count occurrences, since interned fields may appear in many places
+    n_strings = 0
+    n_compared = 0
+    for expression in expressions:
+        for e in expression.subexpressions():
+            if is_string(e):
+                n_strings += 1
+            elif type(e) == ComparatorExpression:
+                left = is_string(e.left_expression)
+                right = is_string(e.right_expression)
+                if left != right:
+                    return False
+                if left:
+                    n_compared += 2
+    return n_strings == n_compared
+
+
+# Integers beyond this magnitude are not all exactly representable as floats
+MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+def asdps_to_soa(asdps, fields, strings=()):
+    """
+    Converts ASDPs into a tuple of the number of ASDPs, a dictionary of
+    NumPy arrays holding the values of each field, and a dictionary of codes
+    for string values.
+
+    Numeric fields are stored as floats. Fields holding strings are stored as
+    integer codes, which are shared between fields and the given additional
+    strings, and ordered in the same way as the strings themselves. Returns
+    None if any ASDP is missing a field, a field holds other values, or an
+    integer is too large to be represented exactly as a float.
+    """
+    import numpy as np
+
+    values = {}
+    for f in fields:
+        try:
+            values[f] = [a[f] for a in asdps]
+        except KeyError:
+            return None
+
+    columns = {}
+    string_fields = []
+    all_strings = set(strings)
+    for f, vs in values.items():
+        if all(type(v) == str for v in vs):
+            string_fields.append(f)
+            all_strings.update(vs)
+        elif all(isinstance(v, (int, float)) for v in vs):
+            if any(type(v) == int and abs(v) > MAX_EXACT_FLOAT_INT for v in vs):
+                return None
+            columns[f] = np.array(vs, dtype=np.float64)
+        else:
+            return None
+
+    codes = {s: i for i, s in enumerate(sorted(all_strings))}
+    for f in string_fields:
+        columns[f] = np.array([codes[v] for v in values[f]], dtype=np.int64)
+
+    return len(asdps), columns, codes
+
+
+# Constraints over multiple variables are evaluated over NumPy arrays of all
+# assignments of ASDPs to variables when there are at least this many
+# assignments, so that the overhead of converting ASDPs pays off, and at most
+# this many, so that the arrays fit comfortably in memory. With one variable,
+# converting ASDPs costs about as much as evaluating the constraint.
+VECTORIZE_MIN_ASSIGNMENTS = 10000
+VECTORIZE_MAX_ASSIGNMENTS = 10000000
+
+
 class JSONEncodable:
 
+    __slots__ = ()
+
 
     def _json(self):
         raise NotImplementedError()
@@ -30,18 +397,31 @@ class JSONEncodable:
 
 class Rule(JSONEncodable):
 
+    __slots__ = (
+        'variables', 'application', 'adjustment', 'max_applications',
+        '_apply_fn', '_numba_operands', '_numba_fn',
+    )
+
 
     def __init__(self, variables, application, adjustment, max_applications):
         self.variables = tuple(variables)
 
         application.validate(self.variables)
-        self.application = application
+        self.application = application.intern()
 
         adjustment.validate(self.variables)
-        self.adjustment = adjustment
+        self.adjustment = adjustment.intern()
 
         self.max_applications = max_applications
 
+        self._apply_fn = self._compile()
+
+        # Compiled with Numba on first use
+        self._numba_operands = _numba_operands(
+            self.application, self.adjustment
+        )
+        self._numba_fn = None
+
         unused = (
             set(self.variables) -
             (application.exposed_variables() | adjustment.exposed_variables())
@@ -50,29 +430,183 @@ class Rule(JSONEncodable):
             print(f'Warning: unused variables {unused}')
 
 
-    def apply(self, asdps):
-
-        total_adj_value = 0
-        n_applications = 0
+    def _compile(self):
+        try:
+            return self._compile_python()
+        except _COMPILE_ERRORS:
+            return self._compile_ops()
+
+
+    def _compile_python(self):
+        loops, indent = _assignment_loops(self.variables)
+        values = ', '.join(_variable_name(v) for v in self.variables)
+        names = _shared_subexpressions(self.application, self.adjustment)
+        lines = [
+            'def apply(_asdps):',
+            '    _indexes = {}',
+            '    _total_adj_value = 0',
+            '    _n_applications = 0',
+            '    _debug = _log.isEnabledFor(_DEBUG)',
+            *loops,
+            f'{indent}if {self.application.compile(names, True)}:',
+            f'{indent}    _n_applications += 1',
+            f'{indent}    _adj_value = {self.adjustment.compile(names)}',
+            f'{indent}    _total_adj_value += _adj_value',
+            f'{indent}    if _debug:',
+            f'{indent}        _log_application(_variables, ({values},), _adj_value)',
+        ]
+        if self.max_applications is not None:
+            lines += [
+                f'{indent}    if _n_applications >= {self.max_applications}:',
+                f'{indent}        return _total_adj_value',
+            ]
+        lines.append('    return _total_adj_value')
+
+        return _compile_function('apply', lines, {
+            '_variables': self.variables,
+            '_log': _log,
+            '_DEBUG': logging.DEBUG,
+            '_log_application': _log_application,
+        })
+
+
+    def _compile_ops(self):
+        application = []
+        self.application.compile_ops(application)
+        adjustment = []
+        self.adjustment.compile_ops(adjustment)
+
+        def apply(asdps):
+            total_adj_value = 0
+            n_applications = 0
+            debug = _log.isEnabledFor(logging.DEBUG)
+            assignment = {}
+            for values in product(asdps, repeat=len(self.variables)):
+                assignment.update(zip(self.variables, values))
+                if _run_ops(application, assignment, asdps):
+                    n_applications += 1
+                    adj_value = _run_ops(adjustment, assignment, asdps)
+                    total_adj_value += adj_value
+                    if debug:
+                        _log_application(self.variables, values, adj_value)
+                    if ((self.max_applications is not None) and
+                        (n_applications >= self.max_applications)):
+                        return total_adj_value
+            return total_adj_value
+
+        return apply
+
+
+    def compile_numba(self):
+        """
+        Returns a Numba-compiled function taking the number of ASDPs, whether
+        to collect applications, a column for each of the rule's fields and a
+        code for each of its string constants (see `asdps_to_soa`), which
+        returns the total adjustment value and a list of (ASDP indices...,
+        adjustment value) for each application if collected (otherwise an
+        empty list). Returns None if the rule cannot be compiled or Numba is
+        unavailable.
+        """
+        if self._numba_operands is None:
+            return None
+        numba = _import_numba()
+        if numba is None:
+            return None
+
+        # Lower fields and string constants to array elements and arguments
+        fields, strings = self._numba_operands
+        names = {}
+        for expression in (self.application, self.adjustment):
+            for e in expression.subexpressions():
+                if type(e) == Field:
+                    c = fields.index(e.field_name)
+                    i = self.variables.index(e.variable_name)
+                    names[id(e)] = f'_c{c}[_i{i}]'
+                elif type(e) == StringConstant:
+                    names[id(e)] = f'_k{strings.index(e.value)}'
+        args = (
+            ['_n', '_collect'] +
+            [f'_c{c}' for c in range(len(fields))] +
+            [f'_k{k}' for k in range(len(strings))]
+        )
 
-        for values in product(*(len(self.variables) * [asdps])):
-            assignment = dict(zip(self.variables, values))
-            assigned_ids = {
-                k: v['id']
-                for k, v in assignment.items()
-            }
+        # The list of applications is initialized with an element so that
+        # Numba can infer its type even if nothing is appended to it
+        initial = ', '.join(['0'] * len(self.variables) + ['0.0'])
+        lines = [
+            f'def apply({", ".join(args)}):',
+            f'    _applied = [({initial})]',
+            '    _applied.clear()',
+            '    _total_adj_value = 0.0',
+            '    _n_applications = 0',
+        ]
+        indent = 4 * ' '
+        for i in range(len(self.variables)):
+            lines.append(f'{indent}for _i{i} in range(_n):')
+            indent += 4 * ' '
+        indices = ', '.join(f'_i{i}' for i in range(len(self.variables)))
+        lines += [
+            f'{indent}if {self.application.compile(names)}:',
+            f'{indent}    _n_applications += 1',
+            f'{indent}    _adj_value = {self.adjustment.compile(names)}',
+            f'{indent}    _total_adj_value += _adj_value',
+            f'{indent}    if _collect:',
+            f'{indent}        _applied.append(({indices}, _adj_value))',
+        ]
+        if self.max_applications is not None:
+            lines += [
+                f'{indent}    if _n_applications >= {self.max_applications}:',
+                f'{indent}        return _total_adj_value, _applied',
+            ]
+        lines.append('    return _total_adj_value, _applied')
+
+        try:
+            apply = _compile_function('apply', lines, {'range': range})
+        except _COMPILE_ERRORS:
+            return None
+        return numba.njit(apply)
+
+
+    def _apply_numba(self, asdps):
+        if self._numba_fn is None:
+            self._numba_fn = self.compile_numba()
+            if self._numba_fn is None:
+                self._numba_fn = _NUMBA_FAILED
+        if self._numba_fn is _NUMBA_FAILED:
+            return None
+
+        fields, strings = self._numba_operands
+        soa = asdps_to_soa(asdps, fields, strings)
+        if soa is None:
+            return None
+
+        n, columns, codes = soa
+        string_fields = set(f for f in fields if columns[f].dtype.kind == 'i')
+        if not _only_compares_strings(
+                (self.application, self.adjustment), string_fields):
+            return None
+
+        # Applications are only returned (and boxed into Python objects) when
+        # they will be logged
+        debug = _log.isEnabledFor(logging.DEBUG)
+        total_adj_value, applied = self._numba_fn(
+            n, debug,
+            *[columns[f] for f in fields], *[codes[s] for s in strings]
+        )
+        for *indices, adj_value in applied:
+            values = [asdps[i] for i in indices]
+            _log_application(self.variables, values, adj_value)
+        return total_adj_value
 
-            if self.application.get_value(assignment, asdps):
-                n_applications += 1
-                adj_value = self.adjustment.get_value(assignment, asdps)
-                total_adj_value += adj_value
-                print(f'Applied rule with {assigned_ids}, adjustment = {adj_value}')
 
-            if ((self.max_applications is not None) and
-                (n_applications >= self.max_applications)):
-                break
+    def apply(self, asdps):
+        if ((self._numba_operands is not None) and
+            (len(asdps) ** len(self.variables) >= NUMBA_MIN_ASSIGNMENTS)):
+            total_adj_value = self._apply_numba(asdps)
+            if total_adj_value is not None:
+                return total_adj_value
 
-        return total_adj_value
+        return self._apply_fn(asdps)
 
 
     def __repr__(self):
@@ -96,33 +630,143 @@ class Rule(JSONEncodable):
 
 class Constraint(JSONEncodable):
 
+    __slots__ = (
+        'variables', 'application', 'sum_field', 'constraint_value',
+        '_aggregate_fn', '_vectorize_operands',
+    )
+
 
     def __init__(self, variables, application, sum_field, constraint_value):
         self.variables = tuple(variables)
 
         application.validate(self.variables)
-        self.application = application
+        self.application = application.intern()
 
         if sum_field is not None:
             sum_field.validate(self.variables)
+            sum_field = sum_field.intern()
         self.sum_field = sum_field
 
         self.constraint_value = constraint_value
 
+        self._aggregate_fn = self._compile()
 
-    def apply(self, asdps):
-        aggregate = 0
+        expressions = (self.application,)
+        if sum_field is not None:
+            expressions += (self.sum_field,)
+        self._vectorize_operands = _numba_operands(*expressions)
+
+
+    def _compile(self):
+        try:
+            return self._compile_python()
+        except _COMPILE_ERRORS:
+            return self._compile_ops()
+
+
+    def _compile_python(self):
+        loops, indent = _assignment_loops(self.variables)
+        if self.sum_field is None:
+            names = {}
+            value = '1'
+            # A count never decreases, so the constraint is violated as soon
+            # as it reaches the constraint value. Summed fields may be
+            # negative, so every assignment is needed to aggregate them.
+            early_exit = [
+                f'{indent}    if _aggregate >= _constraint_value:',
+                f'{indent}        return _aggregate',
+            ]
+        else:
+            names = _shared_subexpressions(self.application, self.sum_field)
+            value = self.sum_field.compile(names)
+            early_exit = []
+        lines = [
+            'def aggregate(_asdps):',
+            '    _indexes = {}',
+            '    _aggregate = 0',
+            *loops,
+            f'{indent}if {self.application.compile(names, True)}:',
+            f'{indent}    _aggregate += {value}',
+            *early_exit,
+            '    return _aggregate',
+        ]
+        return _compile_function(
+            'aggregate', lines, {'_constraint_value': self.constraint_value}
+        )
+
+
+    def _compile_ops(self):
+        application = []
+        self.application.compile_ops(application)
+        sum_field = []
+        if self.sum_field is not None:
+            self.sum_field.compile_ops(sum_field)
+
+        def aggregate(asdps):
+            aggregate = 0
+            assignment = {}
+            for values in product(asdps, repeat=len(self.variables)):
+                assignment.update(zip(self.variables, values))
+                if _run_ops(application, assignment, asdps):
+                    if self.sum_field is None:
+                        aggregate += 1
+                        if aggregate >= self.constraint_value:
+                            return aggregate
+                    else:
+                        aggregate += _run_ops(sum_field, assignment, asdps)
+            return aggregate
+
+        return aggregate
+
+
+    def _aggregate_vectorized(self, asdps):
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+
+        fields, strings = self._vectorize_operands
+        soa = asdps_to_soa(asdps, fields, strings)
+        if soa is None:
+            return None
+
+        n, columns, codes = soa
+        string_fields = set(f for f in fields if columns[f].dtype.kind == 'i')
+        expressions = (self.application,)
+        if self.sum_field is not None:
+            # Also ensures that the summed field does not hold strings
+            expressions += (self.sum_field,)
+        if not _only_compares_strings(expressions, string_fields):
+            return None
+
+        shape = (n,) * len(self.variables)
+        indices = dict(zip(self.variables, np.indices(shape, sparse=True)))
+        applies = np.broadcast_to(
+            self.application.vectorize(columns, codes, indices), shape
+        )
+        if self.sum_field is None:
+            return int(np.count_nonzero(applies))
 
-        for values in product(*(len(self.variables) * [asdps])):
-            assignment = dict(zip(self.variables, values))
+        values = np.broadcast_to(
+            self.sum_field.vectorize(columns, codes, indices), shape
+        )[applies]
+        if len(values) == 0:
+            return 0
+        # Values are summed in order, as in the scalar aggregation
+        return float(np.cumsum(values)[-1])
 
-            if self.application.get_value(assignment, asdps):
-                if self.sum_field is None:
-                    value = 1
-                else:
-                    value = self.sum_field.get_value(assignment, asdps)
-                aggregate += value
 
+    def apply(self, asdps):
+        n_assignments = len(asdps) ** len(self.variables)
+        if ((self._vectorize_operands is not None) and
+            (len(self.variables) > 1) and
+            (VECTORIZE_MIN_ASSIGNMENTS <= n_assignments
+                <= VECTORIZE_MAX_ASSIGNMENTS)):
+            aggregate = self._aggregate_vectorized(asdps)
+            if aggregate is not None:
+                return (aggregate < self.constraint_value)
+
+        aggregate = self._aggregate_fn(asdps)
         return (aggregate < self.constraint_value)
 
 
@@ -142,11 +786,92 @@ class Constraint(JSONEncodable):
 
 class ValueExpression:
 
+    __slots__ = ('__weakref__',)
+
 
     def get_value(self, assignments, asdps):
         raise NotImplementedError()
 
 
+    def compile(self, names=None, bind=False):
+        """
+        Returns a Python expression equivalent to `get_value`, in which each
+        variable is an ASDP and `_asdps` is the list of all ASDPs. If `names`
+        maps the `id` of this expression to a local variable, its value is
+        assigned to that variable (if `bind`) or read from it.
+        """
+        if names is None or id(self) not in names:
+            return self._compile(names, bind)
+        elif bind:
+            return f'({names[id(self)]} := {self._compile(names, bind)})'
+        else:
+            return names[id(self)]
+
+
+    def _compile(self, names, bind):
+        raise NotImplementedError()
+
+
+    def compile_ops(self, ops):
+        """
+        Appends operations to `ops` that evaluate this expression with
+        `_run_ops`, for when it cannot be compiled into Python
+        """
+        raise NotImplementedError()
+
+
+    def vectorize(self, columns, codes, indices):
+        """
+        Returns the value of this expression for every assignment at once, as
+        a NumPy array (or scalar) broadcastable to the shape of the arrays in
+        `indices`, which map each variable to ASDP indices. Fields are read
+        from `columns` and string constants from `codes` (see `asdps_to_soa`).
+        """
+        raise NotImplementedError()
+
+
+    def _key(self):
+        raise NotImplementedError()
+
+
+    def intern(self):
+        """
+        Returns the unique instance of this expression, with any
+        subexpressions interned
+        """
+        return _hcons(self)
+
+
+    def certain_subexpressions(self, value):
+        """
+        Returns the subexpressions, including this one, that are always
+        evaluated when this expression evaluates to `value` (or to anything,
+        if `value` is None)
+        """
+        return [self]
+
+
+    def conjuncts(self):
+        """
+        Returns the expressions that must all hold for this expression to hold
+        """
+        return [self]
+
+
+    def cost_estimate(self):
+        """
+        Returns a rough estimate of the cost of evaluating this expression
+        """
+        return 0
+
+
+    def subexpressions(self):
+        """
+        Returns all subexpressions, including this one
+        """
+        return [self]
+
+
     def validate(self, scope):
         pass
 
@@ -155,8 +880,14 @@ class ValueExpression:
         return set([])
 
 
+# Number of ASDPs assumed when estimating the cost of existential qualifiers
+ASSUMED_N_ASDPS = 100
+
+
 class ExistentialExpression(ValueExpression, JSONEncodable):
 
+    __slots__ = ('variable', 'expression')
+
 
     def __init__(self, variable, expression):
         self.variable = variable
@@ -175,8 +906,8 @@ class ExistentialExpression(ValueExpression, JSONEncodable):
 
 
     def get_value(self, assignments, asdps):
+        new_assignemnts = dict(assignments)
         for a in asdps:
-            new_assignemnts = dict(assignments)
             new_assignemnts[self.variable] = a
             try:
                 value = self.expression.get_value(new_assignemnts, asdps)
@@ -187,6 +918,73 @@ class ExistentialExpression(ValueExpression, JSONEncodable):
         return False
 
 
+    def _key(self):
+        return (type(self).__name__, self.variable, id(self.expression))
+
+
+    def intern(self):
+        self.expression = self.expression.intern()
+        return _hcons(self)
+
+
+    def _index_comparison(self):
+        """
+        Returns a field of the quantified variable, a comparator, and an
+        expression independent of the variable such that the comparison of
+        the field and expression must hold for the expression to hold, or None
+        """
+        comparisons = []
+        for c in self.expression.conjuncts():
+            if not isinstance(c, ComparatorExpression):
+                continue
+            operands = (
+                (c.comparator, c.left_expression, c.right_expression),
+                (_FLIPPED_COMPARATORS.get(c.comparator),
+                    c.right_expression, c.left_expression),
+            )
+            for comparator, field, key in operands:
+                if (comparator in _FLIPPED_COMPARATORS and
+                        isinstance(field, Field) and
+                        field.variable_name == self.variable and
+                        self.variable not in key.exposed_variables()):
+                    comparisons.append((field.field_name, comparator, key))
+                    break
+
+        # Prefer equality, for which the index narrows down candidates most
+        comparisons.sort(key=lambda c: c[1] != '==')
+        return comparisons[0] if len(comparisons) > 0 else None
+
+
+    def subexpressions(self):
+        return [self] + self.expression.subexpressions()
+
+
+    def cost_estimate(self):
+        return ASSUMED_N_ASDPS * self.expression.cost_estimate()
+
+
+    def _compile(self, names, bind):
+        var = _variable_name(self.variable)
+        predicate = f'lambda {var}: {self.expression.compile()}'
+
+        comparison = self._index_comparison()
+        if comparison is None:
+            return f'_exists({predicate}, _asdps)'
+
+        field, comparator, key = comparison
+        candidates = (
+            f'_candidates(_indexes, _asdps, {field!r}, {comparator!r}, '
+            f'lambda: {key.compile()})'
+        )
+        return f'_exists({predicate}, {candidates})'
+
+
+    def compile_ops(self, ops):
+        body = []
+        self.expression.compile_ops(body)
+        ops.append(('EXISTS', self.variable, body))
+
+
     def __str__(self):
         return f'EXISTS {self.variable} : ({self.expression})'
 
@@ -204,6 +1002,8 @@ class ExistentialExpression(ValueExpression, JSONEncodable):
 
 class LogicalConstant(ValueExpression, JSONEncodable):
 
+    __slots__ = ('value',)
+
 
     def __init__(self, value):
         vtype = type(value)
@@ -227,6 +1027,22 @@ class LogicalConstant(ValueExpression, JSONEncodable):
         return self.value
 
 
+    def _key(self):
+        return (type(self).__name__, self.value)
+
+
+    def _compile(self, names, bind):
+        return repr(self.value)
+
+
+    def compile_ops(self, ops):
+        ops.append(('CONST', self.value))
+
+
+    def vectorize(self, columns, codes, indices):
+        return self.value
+
+
     def __str__(self):
         return f'{self.value}'
 
@@ -243,6 +1059,8 @@ class LogicalConstant(ValueExpression, JSONEncodable):
 
 class LogicalNot(ValueExpression, JSONEncodable):
 
+    __slots__ = ('expression',)
+
 
     def __init__(self, expression):
         self.expression = expression
@@ -260,6 +1078,45 @@ class LogicalNot(ValueExpression, JSONEncodable):
         return not self.expression.get_value(assignment, asdps)
 
 
+    def _key(self):
+        return (type(self).__name__, id(self.expression))
+
+
+    def intern(self):
+        self.expression = self.expression.intern()
+        return _hcons(self)
+
+
+    def certain_subexpressions(self, value):
+        return [self] + self.expression.certain_subexpressions(
+            None if value is None else (not value)
+        )
+
+
+    def subexpressions(self):
+        return [self] + self.expression.subexpressions()
+
+
+    def cost_estimate(self):
+        return self.expression.cost_estimate()
+
+
+    def _compile(self, names, bind):
+        return f'(not {self.expression.compile(names, bind)})'
+
+
+    def compile_ops(self, ops):
+        self.expression.compile_ops(ops)
+        ops.append(('UNARY', not_))
+
+
+    def vectorize(self, columns, codes, indices):
+        import numpy as np
+        return np.logical_not(
+            self.expression.vectorize(columns, codes, indices)
+        )
+
+
     def __str__(self):
         return f'NOT {self.expression}'
 
@@ -276,6 +1133,8 @@ class LogicalNot(ValueExpression, JSONEncodable):
 
 class BinaryLogicalExpression(ValueExpression, JSONEncodable):
 
+    __slots__ = ('operator', 'left_expression', 'right_expression')
+
 
     def __init__(self, operator, left_expression, right_expression):
         self.operator = operator
@@ -294,10 +1153,115 @@ class BinaryLogicalExpression(ValueExpression, JSONEncodable):
 
 
     def get_value(self, assignment, asdps):
-        return BinaryLogicalExpression.evaluate(
-            self.operator,
-            self.left_expression.get_value(assignment, asdps),
-            self.right_expression.get_value(assignment, asdps),
+        # Evaluate the right expression only if needed
+        if self.operator == 'AND':
+            return (
+                self.left_expression.get_value(assignment, asdps) and
+                self.right_expression.get_value(assignment, asdps)
+            )
+        elif self.operator == 'OR':
+            return (
+                self.left_expression.get_value(assignment, asdps) or
+                self.right_expression.get_value(assignment, asdps)
+            )
+        else:
+            raise ValueError(f'Unknown logical operator "{self.operator}"')
+
+
+    def _key(self):
+        return (
+            type(self).__name__, self.operator,
+            id(self.left_expression), id(self.right_expression)
+        )
+
+
+    def intern(self):
+        self.left_expression = self.left_expression.intern()
+        self.right_expression = self.right_expression.intern()
+        return _hcons(self)
+
+
+    def certain_subexpressions(self, value):
+        # The right expression is skipped if the left expression determines
+        # the value, which cannot happen if the value is known to be the
+        # operator's identity (True for AND, False for OR)
+        first, second = self._evaluation_order()
+        if (self.operator, value) in (('AND', True), ('OR', False)):
+            return (
+                [self] +
+                first.certain_subexpressions(value) +
+                second.certain_subexpressions(value)
+            )
+        return [self] + first.certain_subexpressions(None)
+
+
+    def _evaluation_order(self):
+        """
+        Returns the operands in the order in which compiled code evaluates
+        them, with the cheaper one first since the other may then be skipped
+        """
+        if (self.right_expression.cost_estimate() <
+                self.left_expression.cost_estimate()):
+            return self.right_expression, self.left_expression
+        return self.left_expression, self.right_expression
+
+
+    def conjuncts(self):
+        if self.operator == 'AND':
+            return (
+                self.left_expression.conjuncts() +
+                self.right_expression.conjuncts()
+            )
+        return [self]
+
+
+    def subexpressions(self):
+        return (
+            [self] +
+            self.left_expression.subexpressions() +
+            self.right_expression.subexpressions()
+        )
+
+
+    def cost_estimate(self):
+        return (
+            self.left_expression.cost_estimate() +
+            self.right_expression.cost_estimate()
+        )
+
+
+    def _compile(self, names, bind):
+        if self.operator not in ('AND', 'OR'):
+            raise ValueError(f'Unknown logical operator "{self.operator}"')
+        first, second = self._evaluation_order()
+        first = first.compile(names, bind)
+        second = second.compile(names, bind)
+        return f'({first} {self.operator.lower()} {second})'
+
+
+    def compile_ops(self, ops):
+        if self.operator not in ('AND', 'OR'):
+            raise ValueError(f'Unknown logical operator "{self.operator}"')
+        first, second = self._evaluation_order()
+        first.compile_ops(ops)
+        # Jumps past the second operand if the first one determines the value
+        jump = len(ops)
+        ops.append(None)
+        second.compile_ops(ops)
+        ops[jump] = (self.operator, len(ops))
+
+
+    def vectorize(self, columns, codes, indices):
+        import numpy as np
+        if self.operator == 'AND':
+            combine = np.logical_and
+        elif self.operator == 'OR':
+            combine = np.logical_or
+        else:
+            raise ValueError(f'Unknown logical operator "{self.operator}"')
+        return combine(
+            self.left_expression.vectorize(columns, codes, indices),
+            self.right_expression.vectorize(columns, codes, indices),
         )
 
 
@@ -333,6 +1297,8 @@ class BinaryLogicalExpression(ValueExpression, JSONEncodable):
 
 class StringConstant(ValueExpression, JSONEncodable):
 
+    __slots__ = ('value',)
+
 
     def __init__(self, value):
         self.value = value
@@ -342,6 +1308,22 @@ class StringConstant(ValueExpression, JSONEncodable):
         return self.value
 
 
+    def _key(self):
+        return (type(self).__name__, self.value)
+
+
+    def _compile(self, names, bind):
+        return repr(self.value)
+
+
+    def compile_ops(self, ops):
+        ops.append(('CONST', self.value))
+
+
+    def vectorize(self, columns, codes, indices):
+        return codes[self.value]
+
+
     def __str__(self):
         return f'"{self.value}"'
 
@@ -358,6 +1340,8 @@ class StringConstant(ValueExpression, JSONEncodable):
 
 class ComparatorExpression(ValueExpression, JSONEncodable):
 
+    __slots__ = ('comparator', 'left_expression', 'right_expression')
+
 
     def __init__(self, comparator, left_expression, right_expression):
         self.comparator = comparator
@@ -368,20 +1352,9 @@ class ComparatorExpression(ValueExpression, JSONEncodable):
     @staticmethod
     def evaluate(comparator, left_value, right_value):
         # TODO: Handle type mismatch
-        if comparator == '<':
-            return (left_value < right_value)
-        elif comparator == '<=':
-            return (left_value <= right_value)
-        elif comparator == '>':
-            return (left_value > right_value)
-        elif comparator == '>=':
-            return (left_value >= right_value)
-        elif comparator == '==':
-            return (left_value == right_value)
-        elif comparator == '!=':
-            return (left_value != right_value)
-        else:
+        if comparator not in _COMPARISONS:
             raise ValueError(f'Unknown comparator "{comparator}"')
+        return _COMPARISONS[comparator](left_value, right_value)
 
 
     def get_value(self, assignment, asdps):
@@ -392,6 +1365,66 @@ class ComparatorExpression(ValueExpression, JSONEncodable):
         )
 
 
+    def _key(self):
+        return (
+            type(self).__name__, self.comparator,
+            id(self.left_expression), id(self.right_expression)
+        )
+
+
+    def intern(self):
+        self.left_expression = self.left_expression.intern()
+        self.right_expression = self.right_expression.intern()
+        return _hcons(self)
+
+
+    def certain_subexpressions(self, value):
+        return (
+            [self] +
+            self.left_expression.certain_subexpressions(None) +
+            self.right_expression.certain_subexpressions(None)
+        )
+
+
+    def subexpressions(self):
+        return (
+            [self] +
+            self.left_expression.subexpressions() +
+            self.right_expression.subexpressions()
+        )
+
+
+    def cost_estimate(self):
+        return (
+            self.left_expression.cost_estimate() +
+            self.right_expression.cost_estimate()
+        )
+
+
+    def _compile(self, names, bind):
+        if self.comparator not in _COMPARISONS:
+            raise ValueError(f'Unknown comparator "{self.comparator}"')
+        left = self.left_expression.compile(names, bind)
+        right = self.right_expression.compile(names, bind)
+        return f'({left} {self.comparator} {right})'
+
+
+    def compile_ops(self, ops):
+        if self.comparator not in _COMPARISONS:
+            raise ValueError(f'Unknown comparator "{self.comparator}"')
+        self.left_expression.compile_ops(ops)
+        self.right_expression.compile_ops(ops)
+        ops.append(('BINARY', _COMPARISONS[self.comparator]))
+
+
+    def vectorize(self, columns, codes, indices):
+        return ComparatorExpression.evaluate(
+            self.comparator,
+            self.left_expression.vectorize(columns, codes, indices),
+            self.right_expression.vectorize(columns, codes, indices),
+        )
+
+
     def validate(self, scope):
         self.left_expression.validate(scope)
         self.right_expression.validate(scope)
@@ -422,11 +1455,24 @@ class ComparatorExpression(ValueExpression, JSONEncodable):
         }
 
 
-class ArithmeticExpression(ValueExpression): pass
+# Comparators with operands swapped, for those that can use an index
+_FLIPPED_COMPARATORS = {
+    '<': '>',
+    '<=': '>=',
+    '>': '<',
+    '>=': '<=',
+    '==': '==',
+}
+
+
+class ArithmeticExpression(ValueExpression):
+    __slots__ = ()
 
 
 class ConstExpression(ArithmeticExpression, JSONEncodable):
 
+    __slots__ = ('value',)
+
 
     def __init__(self, value):
         self.value = float(value)
@@ -436,6 +1482,26 @@ class ConstExpression(ArithmeticExpression, JSONEncodable):
         return self.value
 
 
+    def _key(self):
+        return (type(self).__name__, repr(self.value))
+
+
+    def _compile(self, names, bind):
+        if math.isnan(self.value):
+            return '_nan'
+        elif math.isinf(self.value):
+            return '_inf' if self.value > 0 else '(-_inf)'
+        return repr(self.value)
+
+
+    def compile_ops(self, ops):
+        ops.append(('CONST', self.value))
+
+
+    def vectorize(self, columns, codes, indices):
+        return self.value
+
+
     def __str__(self):
         return f'{self.value}'
 
@@ -453,6 +1519,8 @@ class ConstExpression(ArithmeticExpression, JSONEncodable):
 
 class BinaryExpression(ArithmeticExpression, JSONEncodable):
 
+    __slots__ = ('operator', 'left_expression', 'right_expression')
+
 
     def __init__(self, operator, left_expression, right_expression):
         self.operator = operator
@@ -474,14 +1542,9 @@ class BinaryExpression(ArithmeticExpression, JSONEncodable):
 
     @staticmethod
     def evaluate(operator, left_value, right_value):
-        if operator == '*':
-            return (left_value * right_value)
-        elif operator == '+':
-            return (left_value + right_value)
-        elif operator == '-':
-            return (left_value - right_value)
-        else:
+        if operator not in _ARITHMETIC_OPERATIONS:
             raise ValueError(f'Unknown operator "{operator}"')
+        return _ARITHMETIC_OPERATIONS[operator](left_value, right_value)
 
 
     def get_value(self, assignment, asdps):
@@ -492,6 +1555,66 @@ class BinaryExpression(ArithmeticExpression, JSONEncodable):
         )
 
 
+    def _key(self):
+        return (
+            type(self).__name__, self.operator,
+            id(self.left_expression), id(self.right_expression)
+        )
+
+
+    def intern(self):
+        self.left_expression = self.left_expression.intern()
+        self.right_expression = self.right_expression.intern()
+        return _hcons(self)
+
+
+    def certain_subexpressions(self, value):
+        return (
+            [self] +
+            self.left_expression.certain_subexpressions(None) +
+            self.right_expression.certain_subexpressions(None)
+        )
+
+
+    def subexpressions(self):
+        return (
+            [self] +
+            self.left_expression.subexpressions() +
+            self.right_expression.subexpressions()
+        )
+
+
+    def cost_estimate(self):
+        return (
+            self.left_expression.cost_estimate() +
+            self.right_expression.cost_estimate()
+        )
+
+
+    def _compile(self, names, bind):
+        if self.operator not in _ARITHMETIC_OPERATIONS:
+            raise ValueError(f'Unknown operator "{self.operator}"')
+        left = self.left_expression.compile(names, bind)
+        right = self.right_expression.compile(names, bind)
+        return f'({left} {self.operator} {right})'
+
+
+    def compile_ops(self, ops):
+        if self.operator not in _ARITHMETIC_OPERATIONS:
+            raise ValueError(f'Unknown operator "{self.operator}"')
+        self.left_expression.compile_ops(ops)
+        self.right_expression.compile_ops(ops)
+        ops.append(('BINARY', _ARITHMETIC_OPERATIONS[self.operator]))
+
+
+    def vectorize(self, columns, codes, indices):
+        return BinaryExpression.evaluate(
+            self.operator,
+            self.left_expression.vectorize(columns, codes, indices),
+            self.right_expression.vectorize(columns, codes, indices),
+        )
+
+
     def __str__(self):
         return f'({self.left_expression} {self.operator} {self.right_expression})'
 
@@ -510,8 +1633,127 @@ class BinaryExpression(ArithmeticExpression, JSONEncodable):
         }
 
 
+class NaryExpression(ArithmeticExpression, JSONEncodable):
+    """
+    A left-associative chain of the same associative operator ("+" or "*")
+    """
+
+    __slots__ = ('operator', 'expressions')
+
+
+    def __init__(self, operator, expressions):
+        self.operator = operator
+        self.expressions = tuple(expressions)
+
+
+    def validate(self, scope):
+        for e in self.expressions:
+            e.validate(scope)
+
+
+    def exposed_variables(self):
+        return set().union(*(e.exposed_variables() for e in self.expressions))
+
+
+    def get_value(self, assignment, asdps):
+        value = self.expressions[0].get_value(assignment, asdps)
+        if self.operator == '+':
+            for e in self.expressions[1:]:
+                value += e.get_value(assignment, asdps)
+        elif self.operator == '*':
+            for e in self.expressions[1:]:
+                value *= e.get_value(assignment, asdps)
+        else:
+            raise ValueError(f'Unknown operator "{self.operator}"')
+        return value
+
+
+    def _key(self):
+        return (
+            type(self).__name__, self.operator,
+            *(id(e) for e in self.expressions)
+        )
+
+
+    def intern(self):
+        self.expressions = tuple(e.intern() for e in self.expressions)
+        return _hcons(self)
+
+
+    def certain_subexpressions(self, value):
+        return [self] + [
+            s for e in self.expressions
+            for s in e.certain_subexpressions(None)
+        ]
+
+
+    def subexpressions(self):
+        return [self] + [
+            s for e in self.expressions
+            for s in e.subexpressions()
+        ]
+
+
+    def cost_estimate(self):
+        return sum(e.cost_estimate() for e in self.expressions)
+
+
+    def _compile(self, names, bind):
+        if self.operator not in ('*', '+'):
+            raise ValueError(f'Unknown operator "{self.operator}"')
+        operands = f' {self.operator} '.join(
+            e.compile(names, bind) for e in self.expressions
+        )
+        return f'({operands})'
+
+
+    def compile_ops(self, ops):
+        if self.operator not in ('*', '+'):
+            raise ValueError(f'Unknown operator "{self.operator}"')
+        self.expressions[0].compile_ops(ops)
+        for e in self.expressions[1:]:
+            e.compile_ops(ops)
+            ops.append(('BINARY', _ARITHMETIC_OPERATIONS[self.operator]))
+
+
+    def vectorize(self, columns, codes, indices):
+        value = self.expressions[0].vectorize(columns, codes, indices)
+        for e in self.expressions[1:]:
+            value = BinaryExpression.evaluate(
+                self.operator, value, e.vectorize(columns, codes, indices)
+            )
+        return value
+
+
+    def binary(self):
+        """
+        Returns the equivalent chain of binary expressions
+        """
+        expression = self.expressions[0]
+        for e in self.expressions[1:]:
+            expression = BinaryExpression(self.operator, expression, e)
+        return expression
+
+
+    def __str__(self):
+        operands = f' {self.operator} '.join(map(str, self.expressions))
+        return f'({operands})'
+
+
+    def __repr__(self):
+        reprs = ', '.join(map(repr, self.expressions))
+        return f'NaryExpression({self.operator}, [{reprs}])'
+
+
+    def __json__(self):
+        # Serialized as binary expressions, which the C++ library expects
+        return self.binary().__json__()
+
+
 class MinusExpression(ArithmeticExpression, JSONEncodable):
 
+    __slots__ = ('expression',)
+
 
     def __init__(self, expression):
         self.expression = expression
@@ -529,6 +1771,40 @@ class MinusExpression(ArithmeticExpression, JSONEncodable):
         return -self.expression.get_value(assignment, asdps)
 
 
+    def _key(self):
+        return (type(self).__name__, id(self.expression))
+
+
+    def intern(self):
+        self.expression = self.expression.intern()
+        return _hcons(self)
+
+
+    def certain_subexpressions(self, value):
+        return [self] + self.expression.certain_subexpressions(None)
+
+
+    def subexpressions(self):
+        return [self] + self.expression.subexpressions()
+
+
+    def cost_estimate(self):
+        return self.expression.cost_estimate()
+
+
+    def _compile(self, names, bind):
+        return f'(-{self.expression.compile(names, bind)})'
+
+
+    def compile_ops(self, ops):
+        self.expression.compile_ops(ops)
+        ops.append(('UNARY', neg))
+
+
+    def vectorize(self, columns, codes, indices):
+        return -self.expression.vectorize(columns, codes, indices)
+
+
     def __str__(self):
         return f'-{self.expression}'
 
@@ -545,6 +1821,8 @@ class MinusExpression(ArithmeticExpression, JSONEncodable):
 
 class Field(ArithmeticExpression, JSONEncodable):
 
+    __slots__ = ('variable_name', 'field_name', 'lineno')
+
 
     def __init__(self, variable_name, field_name, lineno):
         self.variable_name = variable_name
@@ -556,6 +1834,28 @@ class Field(ArithmeticExpression, JSONEncodable):
         return assignment[self.variable_name][self.field_name]
 
 
+    def _key(self):
+        # Line numbers are only used for validation, which happens before
+        # expressions are interned
+        return (type(self).__name__, self.variable_name, self.field_name)
+
+
+    def cost_estimate(self):
+        return 1
+
+
+    def _compile(self, names, bind):
+        return f'{_variable_name(self.variable_name)}[{self.field_name!r}]'
+
+
+    def compile_ops(self, ops):
+        ops.append(('FIELD', self.variable_name, self.field_name))
+
+
+    def vectorize(self, columns, codes, indices):
+        return columns[self.field_name][indices[self.variable_name]]
+
+
     def validate(self, scope):
         if self.variable_name not in scope:
             raise ValueError(f'Variable "{self.variable_name}" not in scope (line {self.lineno})')
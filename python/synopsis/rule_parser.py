@@ -1,5 +1,7 @@
-from ply.lex import lex
-from ply.yacc import yacc
+import re
+
+from ply.lex import LexToken
+from ply.yacc import yacc, NullLogger
 
 from rule_ast import *
 
@@ -74,8 +76,8 @@ t_ICONST = r'\d+?'
 # Floating literal
 t_FCONST = r'((\d+)(\.\d+)(e(\+|-)?(\d+))? | (\d+)e(\+|-)?(\d+))'
 
-# String literal
-t_SCONST = r'\"([^\\\n]|(\\.))*?\"'
+# String literal, matched without backtracking
+t_SCONST = r'"(?:[^"\\\n]|\\.)*"'
 
 
 def t_NEWLINE(t):
@@ -97,6 +99,96 @@ def t_error(t):
 t_ignore = ' \t'
 
 
+class RegexLexer:
+    """
+    Lexer for the token rules above, which tokenizes the entire input with a
+    single pass of one regular expression combining all rules, in place of
+    the PLY lexer
+    """
+
+    def __init__(self):
+        rules = [
+            (name, rule) for name, rule in globals().items()
+            if name.startswith('t_') and name not in ('t_ignore', 't_error')
+        ]
+
+        # Rules are tried in the same order as PLY: functions in the order
+        # they are defined, then strings from longest to shortest
+        functions = sorted(
+            [(name, f) for name, f in rules if callable(f)],
+            key=lambda r: r[1].__code__.co_firstlineno
+        )
+        strings = sorted(
+            [(name, s) for name, s in rules if isinstance(s, str)],
+            key=lambda r: len(r[1]), reverse=True
+        )
+        # Ignored characters are consumed ahead of each token, rather than
+        # as a separate match, and anything else is an erroneous character
+        ignore = ''.join(map(re.escape, t_ignore))
+        patterns = (
+            [f'(?P<{name}>{f.__doc__})' for name, f in functions] +
+            [f'(?P<{name}>{s})' for name, s in strings] +
+            [f'(?P<_error>[^{ignore}])']
+        )
+        self._regex = re.compile(
+            f'[{ignore}]*(?:{"|".join(patterns)})', re.VERBOSE
+        )
+
+        # Token type and rule function for each rule's group, indexed by the
+        # group number of a match
+        self._types = [None] * (self._regex.groups + 1)
+        self._functions = [None] * (self._regex.groups + 1)
+        for name, f in functions:
+            self._functions[self._regex.groupindex[name]] = f
+        for name, index in self._regex.groupindex.items():
+            self._types[index] = name[2:]
+        self._error = self._regex.groupindex['_error']
+
+        self.input('')
+
+
+    def input(self, data):
+        self.lineno = 1
+        self._tokens = iter(self._tokenize(data))
+
+
+    def _tokenize(self, data):
+        tokens = []
+        types = self._types
+        functions = self._functions
+        for match in self._regex.finditer(data):
+            index = match.lastindex
+            t = LexToken()
+            t.lexer = self
+            t.lineno = self.lineno
+            t.lexpos = match.start(index)
+
+            if index == self._error:
+                t.type = 'error'
+                t.value = data[t.lexpos:]
+                t_error(t)
+                continue
+
+            t.type = types[index]
+            t.value = match.group(index)
+            if functions[index] is not None:
+                t = functions[index](t)
+                if t is None:
+                    continue
+            tokens.append(t)
+
+        return tokens
+
+
+    def skip(self, n):
+        # Erroneous characters are skipped one at a time during tokenization
+        pass
+
+
+    def token(self):
+        return next(self._tokens, None)
+
+
 precedence = (
     ('left', 'PLUS', 'MINUS'),
     ('left', 'TIMES'),
@@ -315,15 +407,16 @@ def p_logical_expression(p):
                        | NOT conditional_expression
     """
     if len(p) == 4:
-        # Binary Operator
+        # Binary Operator, which is a case-insensitive reserved word
+        operator = p[2].upper()
         if type(p[1]) == LogicalConstant and type(p[3]) == LogicalConstant:
             p[0] = LogicalConstant(BinaryLogicalExpression.evaluate(
-                p[2],
+                operator,
                 p[1].value,
                 p[3].value,
             ))
         else:
-            p[0] = BinaryLogicalExpression(p[2], p[1], p[3])
+            p[0] = BinaryLogicalExpression(operator, p[1], p[3])
 
     else:
         # Unary Operator
@@ -366,7 +459,7 @@ def p_string_expression(p):
     string_expression : SCONST
     """
     # Strip off quote marks
-    p[0] = StringConstant(p[1][1:-1])
+    p[0] = StringConstant(p[1][1:-1]).intern()
 
 
 def p_comparator_expression(p):
@@ -413,7 +506,7 @@ def p_unary_arithmetic_expression(p):
 
     # If operand is constant, negate directly
     if type(p[2]) == ConstExpression:
-        p[0] = ConstExpression(-p[2].value)
+        p[0] = ConstExpression(-p[2].value).intern()
 
     # Otherwise, represent negation
     else:
@@ -440,7 +533,17 @@ def p_binary_arithmetic_expression(p):
             p[2],
             p[1].value,
             p[3].value,
-        ))
+        )).intern()
+
+    # Extend a chain of the same associative operation
+    elif ((p[2] in ('+', '*')) and
+          (type(p[1]) in (BinaryExpression, NaryExpression)) and
+          (p[1].operator == p[2])):
+        if type(p[1]) == NaryExpression:
+            operands = p[1].expressions
+        else:
+            operands = (p[1].left_expression, p[1].right_expression)
+        p[0] = NaryExpression(p[2], operands + (p[3],))
 
     # Otherwise, represent binary operation
     else:
@@ -452,7 +555,10 @@ def p_const_arithmetic_expression(p):
     arithmetic_expression : ICONST
                           | FCONST
     """
-    p[0] = ConstExpression(p[1])
+    # Constants are shared as they are parsed, while fields are only shared
+    # once validated (in the scope of a rule), since each keeps the line
+    # number at which it appears for reporting errors
+    p[0] = ConstExpression(p[1]).intern()
 
 
 def p_field(p):
@@ -462,12 +568,22 @@ def p_field(p):
     p[0] = Field(p[1], p[3], p.slice[1].lineno)
 
 
-SYNOPSIS_LEXER = lex()
-SYNOPSIS_PARSER = yacc()
+SYNOPSIS_LEXER = RegexLexer()
+
+# Parser tables are cached in a module alongside this one. In optimized mode
+# (python -O), cached tables are used without checking them against the
+# grammar.
+SYNOPSIS_PARSER = yacc(
+    optimize=int(not __debug__),
+    debug=False,
+    write_tables=True,
+    tabmodule='synopsis_parsetab',
+    errorlog=NullLogger(),
+)
 
 
 def parse_str(srd_str):
-    return SYNOPSIS_PARSER.parse(srd_str)
+    return SYNOPSIS_PARSER.parse(srd_str, lexer=SYNOPSIS_LEXER)
 
 
 def parse_file(filename):
@@ -1,10 +1,50 @@
 #!/usr/bin/env python
 import json
+import math
 import argparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 from rule_parser import parse_file
-from rule_ast import RuleJSONEncoder
+from rule_ast import to_plain
+
+
+def _orjson_matches_json(plain):
+    """
+    Returns whether orjson encodes the numbers within plain data in the same
+    way as the json module
+    """
+    if isinstance(plain, float):
+        # orjson encodes non-finite numbers as null rather than Infinity or
+        # NaN, and writes exponents differently (1e16 rather than 1e+16)
+        return math.isfinite(plain) and 'e' not in repr(plain)
+    elif isinstance(plain, dict):
+        return all(_orjson_matches_json(v) for v in plain.values())
+    elif isinstance(plain, list):
+        return all(_orjson_matches_json(v) for v in plain)
+    return True
+
+
+def _encode(plain):
+    """
+    Encodes plain data as JSON, producing exactly the output of `json.dumps`
+    (with an indent of 2), using orjson where its output is the same since
+    it is much faster
+    """
+    if orjson is not None and _orjson_matches_json(plain):
+        # Bins are keyed by integer, which json converts to strings
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        encoded = orjson.dumps(plain, option=option)
+
+        # json escapes non-ASCII characters, which orjson writes as UTF-8
+        if encoded.isascii():
+            return encoded
+
+    return json.dumps(plain, indent=2).encode()
 
 
 def compile_rules(input_file, output_file):
@@ -13,8 +53,8 @@ def compile_rules(input_file, output_file):
     ast = parse_file(input_file)
 
     # Save output
-    with open(output_file, 'w+') as f:
-        json.dump(ast, f, cls=RuleJSONEncoder, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(_encode(to_plain(ast)))
 
 
 def main():
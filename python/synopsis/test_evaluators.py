@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Checks that the alternative ways of evaluating rules and constraints (the
+stack machine fallback, Numba and NumPy vectorization) agree with the
+compiled Python functions. Run with `python -m unittest test_evaluators`.
+"""
+import io
+import math
+import random
+import unittest
+import contextlib
+from unittest import mock
+
+import rule_ast
+from rule_parser import parse_str
+
+# Integer constants are written as floats or single digits, since the lexer
+# only matches one digit of an integer constant
+RULES = '''
+RULE (x): APPLIES x.a > 0.5 ADJUST UTILITY x.b * 2;
+RULE (x): APPLIES x.s == "A" AND x.a < 0.7 ADJUST UTILITY 1;
+RULE (x, y): APPLIES x.s < y.s OR x.b != x.b ADJUST UTILITY x.a - y.a;
+RULE (x, y): APPLIES x.a < y.a AND x.s != "B" ADJUST UTILITY y.b
+    MAXIMUM APPLICATIONS 3;
+RULE (x, y, z): APPLIES x.a < y.a AND y.a < z.a ADJUST UTILITY z.b
+    MAXIMUM APPLICATIONS 5;
+RULE (x): APPLIES EXISTS y: (y.a > x.a AND y.s == x.s) ADJUST UTILITY 1;
+RULE (x, y): APPLIES x.id != y.id AND NOT EXISTS z: (z.b > y.b)
+    ADJUST UTILITY 2.5 MAXIMUM APPLICATIONS 2;
+'''
+
+CONSTRAINTS = '''
+CONSTRAINT (x): APPLIES x.a > 0.5 SUM x.b LESS THAN 3.3;
+CONSTRAINT (x, y): APPLIES x.a < y.a AND x.s == y.s COUNT LESS THAN 9;
+CONSTRAINT (x, y): APPLIES x.s == "A" OR y.b != y.b SUM y.a LESS THAN 5.5;
+CONSTRAINT (x, y, z): APPLIES x.s < y.s AND -x.a < z.b COUNT LESS THAN 1e4;
+CONSTRAINT (x, y): APPLIES EXISTS z: (z.a > x.a) AND y.a > 0.5
+    COUNT LESS THAN 5;
+'''
+
+
+def _parse(srd_str, kind):
+    # The parser warns about unused variables on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_str(srd_str)['default'][kind]
+
+
+def _asdps(seed, n):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': i,
+            'a': rng.random(),
+            'b': rng.choice([rng.random(), float('nan')]),
+            's': rng.choice('AB'),
+        }
+        for i in range(n)
+    ]
+
+
+class TestEvaluators(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = _parse(RULES, 'rules')
+        self.constraints = _parse(CONSTRAINTS, 'constraints')
+        self.asdp_sets = [_asdps(seed, n) for seed, n in enumerate(
+            (0, 1, 2, 5, 8, 13)
+        )]
+
+
+    def assertSameValue(self, first, second):
+        if isinstance(first, float) and math.isnan(first):
+            self.assertTrue(math.isnan(second))
+        else:
+            self.assertEqual(first, second)
+
+
+    def test_rule_ops(self):
+        for rule in self.rules:
+            apply_ops = rule._compile_ops()
+            for asdps in self.asdp_sets:
+                with self.subTest(rule=rule, n=len(asdps)):
+                    self.assertSameValue(
+                        rule._apply_fn(asdps), apply_ops(asdps)
+                    )
+
+
+    def test_constraint_ops(self):
+        for constraint in self.constraints:
+            aggregate_ops = constraint._compile_ops()
+            for asdps in self.asdp_sets:
+                with self.subTest(constraint=constraint, n=len(asdps)):
+                    self.assertSameValue(
+                        constraint._aggregate_fn(asdps),
+                        aggregate_ops(asdps),
+                    )
+
+
+    def test_rule_numba(self):
+        if rule_ast._import_numba() is None:
+            self.skipTest('numba is not available')
+
+        for rule in self.rules:
+            for asdps in self.asdp_sets:
+                with self.subTest(rule=rule, n=len(asdps)):
+                    # Rules with existentials are not compiled with Numba,
+                    # and the types of fields are unknown without ASDPs
+                    if rule._numba_operands is not None and asdps:
+                        total_adj_value = rule._apply_numba(asdps)
+                        self.assertIsNotNone(total_adj_value)
+                        self.assertSameValue(
+                            rule._apply_fn(asdps), total_adj_value
+                        )
+
+                    # Also dispatched to by apply above the threshold
+                    with mock.patch.object(
+                            rule_ast, 'NUMBA_MIN_ASSIGNMENTS', 0):
+                        self.assertSameValue(
+                            rule._apply_fn(asdps), rule.apply(asdps)
+                        )
+
+
+    def test_constraint_vectorized(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not available')
+
+        for constraint in self.constraints:
+            for asdps in self.asdp_sets:
+                with self.subTest(constraint=constraint, n=len(asdps)):
+                    expected = (
+                        constraint._aggregate_fn(asdps)
+                        < constraint.constraint_value
+                    )
+
+                    # Counts stop early once the constraint value is reached,
+                    # so only whether the constraint is satisfied is compared
+                    if constraint._vectorize_operands is not None and asdps:
+                        aggregate = constraint._aggregate_vectorized(asdps)
+                        self.assertIsNotNone(aggregate)
+                        self.assertEqual(
+                            expected,
+                            aggregate < constraint.constraint_value,
+                        )
+
+                    with mock.patch.object(
+                            rule_ast, 'VECTORIZE_MIN_ASSIGNMENTS', 0):
+                        self.assertEqual(expected, constraint.apply(asdps))
+
+
+if __name__ == '__main__':
+    unittest.main()